@@ -1,6 +1,9 @@
 from dify_plugin import DifyPluginEnv, Plugin
 
+from src.niutrans import warm_up_client
+
 plugin = Plugin(DifyPluginEnv(MAX_REQUEST_TIMEOUT=120))
 
 if __name__ == "__main__":
+    warm_up_client()
     plugin.run()
@@ -1,8 +1,17 @@
+import asyncio
+import atexit
 import hashlib
+import threading
 import time
-from typing import Annotated, Generator, Optional
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from operator import itemgetter
+from typing import Annotated, ClassVar, Generator, Optional
+from urllib.parse import quote_plus
 
 import httpx
+import msgspec
 from dify_easy.model import (
     BasePlugin,
     Credential,
@@ -25,6 +34,177 @@ class TransResponse(BaseModel):
     errorMsg: Optional[str] = ""
 
 
+class TransResponseMsg(msgspec.Struct, rename={"from_": "from"}, gc=False):
+    """Translate API response, decoded straight from the raw body.
+
+    Used on the request path in place of ``TransResponse``, which is kept for
+    external callers. Like it, every field may be null. Fields only hold strings
+    or None, so instances cannot be part of a reference cycle and are left
+    untracked by the garbage collector.
+    """
+
+    from_: Optional[str] = None
+    to: Optional[str] = ""
+    tgtText: Optional[str] = ""
+    srcText: Optional[str] = ""
+    errorCode: Optional[str] = ""
+    errorMsg: Optional[str] = ""
+
+
+class _TransResult(msgspec.Struct, gc=False):
+    """The response fields the sync request path reads.
+
+    Decoding into it lets msgspec skip the echoed ``srcText`` instead of
+    allocating a string for it.
+    """
+
+    tgtText: Optional[str] = ""
+    errorCode: Optional[str] = ""
+    errorMsg: Optional[str] = ""
+
+
+API_URL = "https://api.niutrans.com"
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+# Per-request srcText limit of the translate API
+MAX_TEXT_LENGTH = 5000
+
+# Commonly used language codes; "" lets the API detect the source language
+LANG_CODES = (
+    "",
+    "zh",
+    "cht",
+    "en",
+    "ja",
+    "ko",
+    "fr",
+    "de",
+    "es",
+    "it",
+    "pt",
+    "ru",
+    "ar",
+    "th",
+    "vi",
+    "id",
+    "ms",
+    "tr",
+    "nl",
+    "pl",
+)
+# Pre-encoded "from=..&to=.." body segments; other codes are formatted per call
+_LANG_PAIR_PARAMS = {
+    (from_, to): f"from={from_}&to={to}".encode("ascii")
+    for from_ in LANG_CODES
+    for to in LANG_CODES
+}
+
+# Idle connections are dropped after KEEPALIVE_EXPIRY seconds; the warmup thread
+# refreshes one well before that
+KEEPALIVE_EXPIRY = 60.0
+WARMUP_INTERVAL = 45.0
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    """Return the process-wide HTTP client, creating it on first use.
+
+    Plugin instances are created per invocation, so the client lives at module
+    level to keep connections alive across calls.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # httpx advertises br/zstd in Accept-Encoding and decodes them
+                # transparently when the brotli/zstandard extras are installed
+                _client = httpx.Client(
+                    base_url=API_URL,
+                    timeout=30,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=20, keepalive_expiry=KEEPALIVE_EXPIRY
+                    ),
+                )
+                atexit.register(_client.close)
+    return _client
+
+
+_warmup_started = False
+
+
+def warm_up_client() -> None:
+    """Keep a connection to the API open in the background, once per process.
+
+    Called from the plugin entrypoint at startup. The thread sends ``HEAD /``
+    right away and again every ``WARMUP_INTERVAL`` seconds, inside the pool's
+    keep-alive expiry, so a tool call arriving at any time can reuse an open
+    connection instead of doing DNS, TCP and TLS setup. This does not help if
+    the server closes idle connections sooner than the interval. ``HEAD /``
+    needs no credentials and its status is ignored.
+    """
+    global _warmup_started
+    with _client_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+
+    def warm_up() -> None:
+        client = _get_client()
+        while True:
+            try:
+                client.head("/")
+            except Exception:
+                pass
+            time.sleep(WARMUP_INTERVAL)
+
+    threading.Thread(target=warm_up, name="niutrans-warmup", daemon=True).start()
+
+
+@lru_cache(maxsize=16)
+def _md5_proto(apikey: str, app_id: str) -> "hashlib._Hash":
+    """Return an md5 context seeded with the signed credential prefix.
+
+    Cached per credentials at module level since plugin instances are created
+    per invocation. Callers ``.copy()`` it; each copy is an independent
+    context, so this is safe to share between threads.
+    """
+    prefix = f"apikey={apikey}&appId={app_id}&"
+    return hashlib.md5(prefix.encode("utf-8"), usedforsecurity=False)
+
+
+class _LRUCache:
+    """Thread-safe LRU mapping shared by all plugin instances."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._data: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: str) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+# Number of recent translations kept per process
+CACHE_SIZE = 1024
+
+_translation_cache = _LRUCache(CACHE_SIZE)
+
+_inflight: dict[tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+
 # class MemResponse(BaseModel):
 #     code: int
 #     msg: Optional[str] = ""
@@ -59,40 +239,161 @@ class NiuTransCredentials(BaseModel):
 
 class NiuTransPlugin(BasePlugin):
     credentials: NiuTransCredentials = NiuTransCredentials()
-    api_url: str = "https://api.niutrans.com"
-    trans_url: str = api_url + "/v2/text/translate"
+    api_url: str = API_URL
+    trans_path: str = "/v2/text/translate"
+    trans_url: str = api_url + trans_path
     mem_db_url: str = api_url + "/v2/memory_db"
 
+    # Keys of the translate payload, which _sign emits in fixed order
+    _PARAM_KEYS: ClassVar[frozenset[str]] = frozenset(
+        ("appId", "from", "srcText", "timestamp", "to")
+    )
+
+    def _sign(self, from_: str, src_text: str, timestamp: int, to: str) -> str:
+        # The API signs apikey, appId, from, srcText, timestamp and to in that
+        # (lexicographic) order; the first two come from the cached prefix
+        tail = f"from={from_}&srcText={src_text}&timestamp={timestamp}&to={to}"
+        credentials = self.credentials
+        md5 = _md5_proto(credentials.apikey, credentials.app_id).copy()
+        md5.update(tail.encode("utf-8"))
+        return md5.hexdigest()
+
     def generate_auth_str(self, params: dict) -> str:
-        sorted_params = sorted(
-            list(params.items()) + [("apikey", self.credentials.apikey)],
-            key=lambda x: x[0],
-        )
-        param_str = "&".join([f"{key}={value}" for key, value in sorted_params])
-        md5 = hashlib.md5()
+        """Sign a request payload given as a dict.
+
+        Translate payloads go through ``_sign``; any other key set falls back
+        to signing the sorted parameters together with the apikey.
+        """
+        if (
+            params.keys() == self._PARAM_KEYS
+            and params["appId"] == self.credentials.app_id
+        ):
+            return self._sign(
+                params["from"], params["srcText"], params["timestamp"], params["to"]
+            )
+
+        items = list(params.items())
+        items.append(("apikey", self.credentials.apikey))
+        items.sort(key=itemgetter(0))
+        param_str = "&".join(f"{key}={value}" for key, value in items)
+        md5 = hashlib.md5(usedforsecurity=False)
         md5.update(param_str.encode("utf-8"))
-        auth_str = md5.hexdigest()
-        return auth_str
+        return md5.hexdigest()
+
+    def build_request_body(
+        self, text: str, from_language: str = "", to_language: str = "en"
+    ) -> bytes:
+        """Build the signed, form-encoded translate request body.
+
+        The signature covers the raw values; only the body is percent-encoded.
+        """
+        timestamp = int(time.time())
+        auth_str = self._sign(from_language, text, timestamp, to_language)
+        lang_params = _LANG_PAIR_PARAMS.get((from_language, to_language))
+        if lang_params is None:
+            lang = f"from={quote_plus(from_language)}&to={quote_plus(to_language)}"
+            lang_params = lang.encode("ascii")
+        body = (
+            f"&appId={quote_plus(self.credentials.app_id)}&authStr={auth_str}"
+            f"&srcText={quote_plus(text)}&timestamp={timestamp}"
+        )
+        return lang_params + body.encode("ascii")
+
+    async def _post_one(
+        self, client: httpx.AsyncClient, body: bytes
+    ) -> TransResponseMsg:
+        response = await client.post(
+            self.trans_path, content=body, headers=FORM_HEADERS
+        )
+        response.raise_for_status()
+        return msgspec.json.decode(response.content, type=TransResponseMsg)
+
+    async def atranslate_many(
+        self, texts: list[str], to_language: str = "en", from_language: str = ""
+    ) -> list[TransResponseMsg]:
+        """Translate several texts concurrently over one connection pool.
+
+        Results are returned in the same order as ``texts``; API-level errors
+        are left in each result's ``errorCode``. If a request fails at the HTTP
+        level, the remaining ones are cancelled and the failures are raised as
+        an ``ExceptionGroup``. The async client is scoped to the call since its
+        connections are bound to the running event loop.
+        """
+        bodies = [
+            self.build_request_body(text, from_language, to_language) for text in texts
+        ]
+        async with httpx.AsyncClient(
+            base_url=self.api_url,
+            timeout=30,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        ) as client:
+            # The task group cancels unfinished siblings on failure, before the
+            # client is closed underneath them
+            async with asyncio.TaskGroup() as group:
+                tasks = [
+                    group.create_task(self._post_one(client, body)) for body in bodies
+                ]
+        return [task.result() for task in tasks]
+
+    def _request_translation(
+        self, from_language: str, to_language: str, text: str
+    ) -> str:
+        body = self.build_request_body(text, from_language, to_language)
+        response = _get_client().post(
+            self.trans_path, content=body, headers=FORM_HEADERS
+        )
+        response.raise_for_status()
+
+        result = msgspec.json.decode(response.content, type=_TransResult)
+        # The API may send null for any field; treat it like an empty string
+        if (result.errorCode or "") != "":
+            raise Exception(f"Translation failed: {result.errorMsg}")
+        return result.tgtText or ""
+
+    def _translate_impl(self, from_language: str, to_language: str, text: str) -> str:
+        # Keyed on the credentials too, so a cache hit never skips their check
+        credentials = self.credentials
+        key = (credentials.apikey, credentials.app_id, from_language, to_language, text)
+        cached = _translation_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Identical concurrent requests wait on the first caller's request
+        with _inflight_lock:
+            future = _inflight.get(key)
+            owner = future is None
+            if owner:
+                future = _inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            translated_text = self._request_translation(
+                from_language, to_language, text
+            )
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            _translation_cache.put(key, translated_text)
+            future.set_result(translated_text)
+            return translated_text
+        finally:
+            with _inflight_lock:
+                del _inflight[key]
 
     @provider
     def verify(self):
         try:
-            data = {
-                "from": "en",
-                "to": "zh",
-                "srcText": "testing",
-                "appId": self.credentials.app_id,
-                "timestamp": int(time.time()),
-            }
+            body = self.build_request_body("testing", "en", "zh")
 
-            auth_str = self.generate_auth_str(data)
-            data["authStr"] = auth_str
-
-            response = httpx.post(self.trans_url, data=data, timeout=30)
+            response = _get_client().post(
+                self.trans_path, content=body, headers=FORM_HEADERS
+            )
             response.raise_for_status()
 
-            result = TransResponse(**response.json())
-            code = result.errorCode
+            result = msgspec.json.decode(response.content, type=_TransResult)
+            code = result.errorCode or ""
             if code != "":
                 raise Exception(f"Error code: {code}, message: {result.errorMsg}")
 
@@ -141,37 +442,129 @@ class NiuTransPlugin(BasePlugin):
         ] = "en",
     ) -> Generator:
         """Translate text"""
-        data = {
-            "from": from_language,
-            "to": to_language,
-            "appId": self.credentials.app_id,
-            "timestamp": int(time.time()),
-            "srcText": text,
-        }
+        try:
+            translated_text = self._translate_impl(from_language, to_language, text)
 
-        auth_str = self.generate_auth_str(data)
-        data["authStr"] = auth_str
+            yield {
+                "translated_text": translated_text,
+                "source_language": from_language or "auto",
+                "target_language": to_language,
+                "original_text": text,
+                "error_code": "",
+                "error_msg": "",
+            }
+            yield translated_text
 
-        try:
-            response = httpx.post(self.trans_url, data=data, timeout=30)
-            response.raise_for_status()
+        except Exception as e:
+            raise Exception(f"Translation request failed: {str(e)}")
 
-            result = TransResponse(**response.json())
+    def _translate_lines(
+        self, from_language: str, to_language: str, texts: list[str]
+    ) -> list[str]:
+        """Translate single-line texts in as few requests as possible.
 
-            if result.errorCode != "":
-                raise Exception(f"Translation failed: {result.errorMsg}")
+        The API keeps line breaks, so texts are sent newline-joined in chunks
+        of at most ``MAX_TEXT_LENGTH`` characters and each translation is
+        split back into lines. Blank texts are not sent and are returned as is.
+        """
+        for index, text in enumerate(texts):
+            if "\n" in text or "\r" in text:
+                raise Exception(f"Text at index {index} must not contain line breaks")
+            if len(text) > MAX_TEXT_LENGTH:
+                raise Exception(
+                    f"Text at index {index} is longer than "
+                    f"{MAX_TEXT_LENGTH} characters"
+                )
+
+        results = list(texts)
+        chunk: list[int] = []
+        chunk_length = 0
+        for index, text in enumerate(texts):
+            if not text.strip():
+                continue
+            # Every text after the first in a chunk adds a separating newline
+            added = len(text) + (1 if chunk else 0)
+            if chunk and chunk_length + added > MAX_TEXT_LENGTH:
+                self._translate_chunk(from_language, to_language, texts, chunk, results)
+                chunk, chunk_length, added = [], 0, len(text)
+            chunk.append(index)
+            chunk_length += added
+        if chunk:
+            self._translate_chunk(from_language, to_language, texts, chunk, results)
+        return results
+
+    def _translate_chunk(
+        self,
+        from_language: str,
+        to_language: str,
+        texts: list[str],
+        indices: list[int],
+        results: list[str],
+    ) -> None:
+        joined = "\n".join(texts[index] for index in indices)
+        lines = self._translate_impl(from_language, to_language, joined).split("\n")
+        if len(lines) != len(indices):
+            raise Exception(
+                f"Expected {len(indices)} translated lines, got {len(lines)}"
+            )
+        for index, line in zip(indices, lines):
+            results[index] = line
 
-            translated_text = result.tgtText
+    @tool(
+        name="translate_batch",
+        label="Translate Batch",
+        description="Translate a list of texts in a single request",
+    )
+    def translate_batch(
+        self,
+        texts: Annotated[
+            str,
+            Param(
+                name="texts",
+                label="Texts to Translate",
+                description='JSON array of single-line texts, e.g.: ["Hello", "Good morning"]',
+                llm_description='JSON array of single-line texts to be translated, e.g.: ["Hello", "Good morning"]. Texts must not contain line breaks',
+                type=ParamType.string,
+                required=True,
+            ),
+        ],
+        from_language: Annotated[
+            str,
+            Param(
+                name="from_language",
+                label="Source Language",
+                description="Source language code, e.g.: zh(Chinese), en(English), ja(Japanese), ko(Korean), etc.",
+                llm_description="Source language code, e.g.: zh(Chinese), en(English), ja(Japanese), ko(Korean), etc. If not provided, the system will auto-detect",
+                type=ParamType.string,
+                required=False,
+            ),
+        ] = "",
+        to_language: Annotated[
+            str,
+            Param(
+                name="to_language",
+                label="Target Language",
+                description="Target language code, e.g.: zh(Chinese), en(English), ja(Japanese), ko(Korean), etc.",
+                llm_description="Target language code, e.g.: zh(Chinese), en(English), ja(Japanese), ko(Korean), etc.",
+                type=ParamType.string,
+                required=True,
+            ),
+        ] = "en",
+    ) -> Generator:
+        """Translate a batch of texts"""
+        try:
+            original_texts = msgspec.json.decode(texts, type=list[str])
+            translated_texts = self._translate_lines(
+                from_language, to_language, original_texts
+            )
 
             yield {
-                "translated_text": translated_text,
+                "translated_texts": translated_texts,
                 "source_language": from_language or "auto",
                 "target_language": to_language,
-                "original_text": text,
-                "error_code": result.errorCode,
-                "error_msg": result.errorMsg,
+                "original_texts": original_texts,
             }
-            yield translated_text
+            yield "\n".join(translated_texts)
 
         except Exception as e:
             raise Exception(f"Translation request failed: {str(e)}")
@@ -0,0 +1,84 @@
+import pytest
+
+from src import niutrans
+from src.niutrans import NiuTransCredentials, NiuTransPlugin
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Stub the API call, recording each srcText and upper-casing it."""
+    calls = []
+
+    def fake_translate_impl(self, from_language, to_language, text):
+        calls.append(text)
+        return text.upper()
+
+    monkeypatch.setattr(NiuTransPlugin, "_translate_impl", fake_translate_impl)
+    return calls
+
+
+def make_plugin() -> NiuTransPlugin:
+    return NiuTransPlugin(credentials=NiuTransCredentials(app_id="app", apikey="key"))
+
+
+def test_single_request_for_short_texts(sent):
+    result = make_plugin()._translate_lines("en", "zh", ["a", "b", "c"])
+
+    assert result == ["A", "B", "C"]
+    assert sent == ["a\nb\nc"]
+
+
+def test_blank_texts_are_not_sent_and_keep_their_position(sent):
+    texts = ["", "a", " ", "", "b", ""]
+
+    result = make_plugin()._translate_lines("en", "zh", texts)
+
+    assert result == ["", "A", " ", "", "B", ""]
+    assert sent == ["a\nb"]
+
+
+def test_nothing_sent_without_non_blank_texts(sent):
+    assert make_plugin()._translate_lines("en", "zh", []) == []
+    assert make_plugin()._translate_lines("en", "zh", ["", "  "]) == ["", "  "]
+    assert sent == []
+
+
+def test_texts_are_split_into_chunks_under_the_limit(sent, monkeypatch):
+    monkeypatch.setattr(niutrans, "MAX_TEXT_LENGTH", 10)
+    texts = ["aaaa", "bbbb", "", "cc", "dddddddddd", "e"]
+
+    result = make_plugin()._translate_lines("en", "zh", texts)
+
+    assert result == ["AAAA", "BBBB", "", "CC", "DDDDDDDDDD", "E"]
+    assert sent == ["aaaa\nbbbb", "cc", "dddddddddd", "e"]
+    assert all(len(text) <= 10 for text in sent)
+
+
+def test_chunk_filled_exactly_to_the_limit(sent, monkeypatch):
+    monkeypatch.setattr(niutrans, "MAX_TEXT_LENGTH", 9)
+    make_plugin()._translate_lines("en", "zh", ["aaaa", "bbbb", "c"])
+
+    assert sent == ["aaaa\nbbbb", "c"]
+
+
+@pytest.mark.parametrize("text", ["a\nb", "a\rb", "a\r\n"])
+def test_line_breaks_are_rejected(sent, text):
+    with pytest.raises(Exception, match="index 1 must not contain line breaks"):
+        make_plugin()._translate_lines("en", "zh", ["ok", text])
+    assert sent == []
+
+
+def test_overlong_text_is_rejected(sent, monkeypatch):
+    monkeypatch.setattr(niutrans, "MAX_TEXT_LENGTH", 3)
+    with pytest.raises(Exception, match="index 0 is longer than 3 characters"):
+        make_plugin()._translate_lines("en", "zh", ["abcd"])
+    assert sent == []
+
+
+def test_line_count_mismatch_raises(monkeypatch):
+    monkeypatch.setattr(
+        NiuTransPlugin, "_translate_impl", lambda self, f, t, text: "merged"
+    )
+
+    with pytest.raises(Exception, match="Expected 2 translated lines, got 1"):
+        make_plugin()._translate_lines("en", "zh", ["a", "b"])